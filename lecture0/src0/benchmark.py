@@ -0,0 +1,122 @@
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from generate import METHODS, generate
+from maze import Maze, STRATEGIES
+
+FIELDS = [
+    "method", "size", "density", "seed", "strategy", "solved", "path_length",
+    "num_explored", "max_frontier", "seconds", "peak_bytes"
+]
+
+
+def random_maze(size, density, seed):
+    """
+    Returns a size x size maze whose cells are walls with probability
+    density, starting in the top left corner and ending in the bottom right.
+    """
+    rng = random.Random(seed)
+    walls = bytearray(rng.random() < density for _ in range(size * size))
+    start, goal = 0, size * size - 1
+    walls[start] = walls[goal] = 0
+    return Maze.from_grid(walls, size, size, start, goal)
+
+
+def measure(maze, strategy):
+    """Solves maze with strategy and returns the search statistics."""
+
+    # Time a plain run first, since tracing allocations slows search down
+    solved = True
+    start = time.perf_counter()
+    try:
+        maze.solve(strategy)
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        solved = False
+    seconds = time.perf_counter() - start
+
+    # Then solve again under tracemalloc for the peak memory of the search
+    tracemalloc.start()
+    try:
+        maze.solve(strategy)
+    except Exception:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "solved": solved,
+        "path_length": len(maze.solution[0]) if solved else None,
+        "num_explored": maze.num_explored,
+        "max_frontier": maze.max_frontier,
+        "seconds": seconds,
+        "peak_bytes": peak
+    }
+
+
+def run(sizes, densities, seeds, strategies, method="noise"):
+    """
+    Returns one result row per maze and strategy. Mazes are random wall
+    noise for method "noise", or else perfect mazes from generate.py, for
+    which densities do not apply.
+    """
+    if method != "noise":
+        densities = [None]
+    rows = []
+    for size in sizes:
+        for density in densities:
+            for seed in seeds:
+                if method == "noise":
+                    maze = random_maze(size, density, seed)
+                else:
+                    maze = generate(size, size, method, seed)
+                for strategy in strategies:
+                    row = {
+                        "method": method,
+                        "size": size,
+                        "density": density,
+                        "seed": seed,
+                        "strategy": strategy
+                    }
+                    row.update(measure(maze, strategy))
+                    rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.25])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--method", choices=("noise",) + METHODS, default="noise")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES,
+                        default=list(STRATEGIES))
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.densities, args.seeds, args.strategies,
+               args.method)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    if not args.csv and not args.json:
+        writer = csv.DictWriter(sys.stdout, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
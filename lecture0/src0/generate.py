@@ -0,0 +1,146 @@
+import argparse
+import random
+
+from maze import Maze
+
+METHODS = ("backtracker", "prim", "kruskal")
+
+
+def carve(height, width, method="backtracker", seed=None):
+    """
+    Returns the wall grid of a perfect maze, one byte per cell as in
+    Maze.walls. Rooms sit on even rows and columns and the walls between
+    them are knocked out by method: "backtracker", "prim" or "kruskal".
+    """
+    if height < 1 or width < 1:
+        raise ValueError("maze must be at least 1x1")
+    rng = random.Random(seed)
+    rand = rng.random
+
+    # Rooms are tracked as (cell, row, column); a room is carved out of the
+    # solid grid when it is first reached, so walls doubles as visited set
+    walls = bytearray(b"\x01") * (height * width)
+    down = 2 * width
+    last_row = 2 * ((height - 1) // 2)
+    last_col = 2 * ((width - 1) // 2)
+
+    # The start and goal rooms must differ
+    if last_row == 0 and last_col == 0:
+        raise ValueError("maze must have at least two rooms")
+
+    def unvisited(cell, r, c):
+        """Returns the rooms next to a room that are still solid."""
+        result = []
+        if r > 0 and walls[cell - down]:
+            result.append((cell - down, r - 2, c))
+        if r < last_row and walls[cell + down]:
+            result.append((cell + down, r + 2, c))
+        if c > 0 and walls[cell - 2]:
+            result.append((cell - 2, r, c - 2))
+        if c < last_col and walls[cell + 2]:
+            result.append((cell + 2, r, c + 2))
+        return result
+
+    if method == "backtracker":
+
+        # Depth-first walk to random unvisited rooms, backing up at dead ends
+        walls[0] = 0
+        stack = [(0, 0, 0)]
+        while stack:
+            room = stack[-1]
+            options = unvisited(*room)
+            if not options:
+                stack.pop()
+                continue
+            n = options[int(rand() * len(options))]
+            walls[(room[0] + n[0]) // 2] = 0
+            walls[n[0]] = 0
+            stack.append(n)
+
+    elif method == "prim":
+
+        # Grow one tree by adding a random edge from it to a new room
+        walls[0] = 0
+        edges = [(0, n) for n in unvisited(0, 0, 0)]
+        while edges:
+            i = int(rand() * len(edges))
+            edges[i], edges[-1] = edges[-1], edges[i]
+            cell, n = edges.pop()
+            if not walls[n[0]]:
+                continue
+            walls[(cell + n[0]) // 2] = 0
+            walls[n[0]] = 0
+            edges.extend((n[0], m) for m in unvisited(*n))
+
+    elif method == "kruskal":
+
+        # Join random edges whose rooms are not yet in the same tree, with
+        # rooms numbered row by row for the union-find forest
+        cols = last_col // 2 + 1
+        rooms = (last_row // 2 + 1) * cols
+        parent = list(range(rooms))
+
+        def find(k):
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        edges = [(k, k + 1) for k in range(rooms) if k % cols < cols - 1]
+        edges.extend((k, k + cols) for k in range(rooms - cols))
+        rng.shuffle(edges)
+        for r in range(0, last_row + 1, 2):
+            walls[r * width:(r + 1) * width:2] = bytes(cols)
+        for a, b in edges:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_a] = root_b
+
+                # Halfway between the cells of room a and room b
+                walls[(a // cols + b // cols) * width + a % cols + b % cols] = 0
+
+    else:
+        raise ValueError(f"unknown method {method}")
+
+    return walls
+
+
+def generate(height, width, method="backtracker", seed=None):
+    """
+    Returns a perfect maze of height x width cells, starting in the top
+    left room and ending in the bottom right one.
+    """
+    walls = carve(height, width, method, seed)
+    goal = 2 * ((height - 1) // 2) * width + 2 * ((width - 1) // 2)
+    return Maze.from_grid(walls, height, width, 0, goal)
+
+
+def write(maze, filename):
+    """Writes maze to filename in the text format Maze reads."""
+    chars = maze.walls.translate(bytes.maketrans(b"\x00\x01", b" #"))
+    chars[maze.start] = ord("A")
+    chars[maze.goal] = ord("B")
+    with open(filename, "wb") as f:
+        for i in range(maze.height):
+            f.write(chars[i * maze.width:(i + 1) * maze.width])
+            f.write(b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a random maze.")
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("filename")
+    parser.add_argument("--method", choices=METHODS, default="backtracker")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    try:
+        maze = generate(args.height, args.width, args.method, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    write(maze, args.filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,36 @@
+import heapq
+import itertools
+import math
+import mmap
 import sys
+from collections import deque
 
 class Node():
-    def __init__(self, state, parent, action):
+    __slots__ = ("state", "parent", "action", "cost")
+
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Companion set of the states in the frontier, for O(1) lookups
+        self.states = set()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states.add(node.state)
+
+    def __len__(self):
+        return len(self.frontier)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,8 +39,8 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.states.discard(node.state)
             return node
 
 
@@ -35,100 +50,268 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
             return node
 
+
+class PriorityFrontier():
+    def __init__(self, priority):
+        self.frontier = []
+        self.priority = priority
+
+        # Best known cost of every state in the frontier
+        self.costs = {}
+
+        # Tie-breaker so that nodes themselves are never compared
+        self.counter = itertools.count()
+
+    def add(self, node):
+        self.costs[node.state] = node.cost
+        heapq.heappush(
+            self.frontier, (self.priority(node), next(self.counter), node)
+        )
+
+    def contains_state(self, state):
+        return state in self.costs
+
+    def __len__(self):
+        return len(self.costs)
+
+    def cost(self, state):
+        return self.costs[state]
+
+    def empty(self):
+        return len(self.costs) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            while True:
+                _, _, node = heapq.heappop(self.frontier)
+
+                # Skip entries superseded by a cheaper path to the same state
+                if self.costs.get(node.state) == node.cost:
+                    del self.costs[node.state]
+                    return node
+
+
+def manhattan(state, goal):
+    """Manhattan distance between two cells."""
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+
+def octile(state, goal):
+    """Octile distance between two cells."""
+    dy = abs(state[0] - goal[0])
+    dx = abs(state[1] - goal[1])
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+
+STRATEGIES = ("dfs", "bfs", "greedy", "astar", "bidirectional", "jps")
+
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+DIRECTIONS = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+# Moves a jump point search may continue with, given the move that reached
+# the node: straight on, or turning off the line it was moving along
+TURNS = {
+    "up": ("up", "left", "right"),
+    "down": ("down", "left", "right"),
+    "left": ("left", "up", "down"),
+    "right": ("right", "up", "down")
+}
+
+# Maps every byte of a maze file to its wall flag: only " ", "A" and "B"
+# are open cells
+WALLS = bytes(0 if c in b" AB" else 1 for c in range(256))
+
+
+def backtrack(node):
+    """Returns the actions and cells that lead from the root to node."""
+    actions = []
+    cells = []
+    while node.parent is not None:
+        actions.append(node.action)
+        cells.append(node.state)
+        node = node.parent
+    actions.reverse()
+    cells.reverse()
+    return actions, cells
+
+
+def line_spans(contents):
+    """Yields the (start, end) offsets of every line in a maze file."""
+    start = 0
+    while start < len(contents):
+        end = contents.find(b"\n", start)
+        if end == -1:
+            end = len(contents)
+        stop = end
+        if stop > start and contents[stop - 1] == ord("\r"):
+            stop -= 1
+        yield start, stop
+        start = end + 1
+
+
 class Maze():
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+        # Map the file instead of reading it, so the text is never copied
+        with open(filename, "rb") as f:
+            if f.seek(0, 2) == 0:
+                self.load(b"")
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                    self.load(contents)
+
+        self.solution = None
+
+
+    @classmethod
+    def from_grid(cls, walls, height, width, start, goal):
+        """
+        Returns a maze built straight from a wall grid, one byte per cell as
+        in Maze.walls, with start and goal given as cell ids.
+        """
+        if len(walls) != height * width:
+            raise Exception("grid does not match maze size")
+        if walls[start] or walls[goal]:
+            raise Exception("start and goal must not be walls")
+        maze = cls.__new__(cls)
+        maze.height = height
+        maze.width = width
+        maze.walls = bytearray(walls)
+        maze.start = start
+        maze.goal = goal
+        maze.solution = None
+        return maze
+
+
+    def load(self, contents):
+        """Builds the wall grid from the bytes of a maze file."""
+
+        # Determine height and width of maze
+        self.height = 0
+        self.width = 0
+        for start, stop in line_spans(contents):
+            self.height += 1
+            self.width = max(self.width, stop - start)
+
+        # Keep track of walls as one byte per cell, row by row. States are
+        # flat cell ids, i * width + j, so each cell costs a single byte
+        self.walls = bytearray(self.height * self.width)
+
+        # Fill walls and find start and goal, one line at a time
+        starts = goals = 0
+        for i, (start, stop) in enumerate(line_spans(contents)):
+            line = contents[start:stop]
+            offset = i * self.width
+            self.walls[offset:offset + len(line)] = line.translate(WALLS)
+            if b"A" in line:
+                starts += line.count(b"A")
+                self.start = offset + line.index(b"A")
+            if b"B" in line:
+                goals += line.count(b"B")
+                self.goal = offset + line.index(b"B")
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if starts != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if goals != 1:
             raise Exception("maze must have exactly one goal")
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
 
-        self.solution = None
+    def cell(self, i, j):
+        """Returns the cell id of row i, column j."""
+        return i * self.width + j
+
+
+    def coords(self, cell):
+        """Returns the (row, column) of a cell id."""
+        return divmod(cell, self.width)
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = self.solution[1] if self.solution is not None else []
+
+        # Pick a character for every cell, then print whole rows at once
+        chars = ["█" if wall else " " for wall in self.walls]
+        for cell in solution:
+            chars[cell] = "*"
+        chars[self.start] = "A"
+        chars[self.goal] = "B"
+
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
+        print("\n".join(
+            "".join(chars[i * self.width:(i + 1) * self.width])
+            for i in range(self.height)
+        ))
         print()
 
 
     def neighbors(self, state):
-        row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
+        walls = self.walls
+        width = self.width
+        row, col = divmod(state, width)
 
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        if row > 0 and not walls[state - width]:
+            result.append(("up", state - width))
+        if row < self.height - 1 and not walls[state + width]:
+            result.append(("down", state + width))
+        if col > 0 and not walls[state - 1]:
+            result.append(("left", state - 1))
+        if col < width - 1 and not walls[state + 1]:
+            result.append(("right", state + 1))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
-
-        # Keep track of number of states explored
+    def frontier(self, strategy, heuristic):
+        """Returns an empty frontier for the given search strategy."""
+        goal = self.coords(self.goal)
+        if strategy == "dfs":
+            return StackFrontier()
+        elif strategy == "bfs":
+            return QueueFrontier()
+        elif strategy == "greedy":
+            return PriorityFrontier(
+                lambda node: heuristic(self.coords(node.state), goal)
+            )
+        elif strategy == "astar":
+            return PriorityFrontier(
+                lambda node: node.cost + heuristic(self.coords(node.state), goal)
+            )
+        raise ValueError(f"unknown strategy {strategy}")
+
+
+    def solve(self, strategy="dfs", heuristic=manhattan):
+        """
+        Finds a solution to maze, if one exists.
+
+        `strategy` is one of "dfs", "bfs", "greedy", "astar",
+        "bidirectional" or "jps"; greedy, A* and jump point search order the
+        frontier by `heuristic(state, goal)` on (row, column) pairs.
+        """
+        if strategy == "bidirectional":
+            return self.solve_bidirectional()
+        if strategy == "jps":
+            return self.solve_jps(heuristic)
+
+        # Keep track of number of states explored and of the frontier size
         self.num_explored = 0
+        self.max_frontier = 0
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        frontier = self.frontier(strategy, heuristic)
         frontier.add(start)
 
-        # Initialize an empty explored set
-        self.explored = set()
+        # Initialize an empty explored set, one flag per cell
+        self.explored = bytearray(len(self.walls))
 
         # Keep looping until solution found
         while True:
@@ -138,92 +321,260 @@ class Maze():
                 raise Exception("no solution")
 
             # Choose a node from the frontier
+            self.max_frontier = max(self.max_frontier, len(frontier))
             node = frontier.remove()
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+                self.solution = backtrack(node)
                 return
 
             # Mark node as explored
-            self.explored.add(node.state)
+            self.explored[node.state] = 1
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+                if self.explored[state]:
+                    continue
 
+                # Only A* revisits a frontier state, and only if it is cheaper
+                cost = node.cost + 1
+                if frontier.contains_state(state):
+                    if strategy != "astar" or frontier.cost(state) <= cost:
+                        continue
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+                child = Node(state=state, parent=node, action=action, cost=cost)
+                frontier.add(child)
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+    def solve_bidirectional(self):
+        """
+        Finds a shortest solution by growing breadth-first frontiers from both
+        the start and the goal until they meet.
+        """
+
+        # Keep track of number of states explored and of the frontier size
+        self.num_explored = 0
+        self.max_frontier = 0
+        self.explored = bytearray(len(self.walls))
+
+        if self.start == self.goal:
+            self.solution = ([], [])
+            return
+
+        # Nodes reached from either end, keyed by state; a node's action is
+        # the move taken away from the end it was reached from
+        forward = {self.start: Node(state=self.start, parent=None, action=None)}
+        backward = {self.goal: Node(state=self.goal, parent=None, action=None)}
+        forward_layer = [forward[self.start]]
+        backward_layer = [backward[self.goal]]
+
+        while forward_layer and backward_layer:
+            self.max_frontier = max(
+                self.max_frontier, len(forward_layer) + len(backward_layer)
+            )
+
+            # Expand a whole layer of the smaller side, so that the best
+            # meeting point found in it gives a shortest path
+            if len(forward_layer) <= len(backward_layer):
+                layer, reached, other = forward_layer, forward, backward
+            else:
+                layer, reached, other = backward_layer, backward, forward
+
+            best = None
+            next_layer = []
+            for node in layer:
+                self.num_explored += 1
+                self.explored[node.state] = 1
+                for action, state in self.neighbors(node.state):
+                    if state in other:
+                        length = node.cost + 1 + other[state].cost
+                        if best is None or length < best[0]:
+                            best = (length, node, action, other[state])
+                    if state not in reached:
+                        child = Node(state=state, parent=node, action=action,
+                                     cost=node.cost + 1)
+                        reached[state] = child
+                        next_layer.append(child)
+
+            # Join the two parent chains at the meeting point
+            if best is not None:
+                _, node, action, meeting = best
+                if reached is backward:
+                    node, meeting = meeting, node
+                    action = OPPOSITE[action]
+                actions, cells = backtrack(node)
+                actions.append(action)
+                cells.append(meeting.state)
+                while meeting.parent is not None:
+                    actions.append(OPPOSITE[meeting.action])
+                    cells.append(meeting.parent.state)
+                    meeting = meeting.parent
+                self.solution = (actions, cells)
+                return
+
+            if reached is forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+        raise Exception("no solution")
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+    def open(self, row, col):
+        """Returns True if (row, col) is inside the maze and not a wall."""
+        return (0 <= row < self.height and 0 <= col < self.width
+                and not self.walls[row * self.width + col])
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+    def jump(self, state, action):
+        """
+        Moves from state in the direction of action until reaching a jump
+        point, and returns it, or None if the move runs into a wall.
+        """
+        dr, dc = DIRECTIONS[action]
+        row, col = self.coords(state)
+        while True:
+            row += dr
+            col += dc
+            if not self.open(row, col):
+                return None
+            state = self.cell(row, col)
+            if state == self.goal:
+                return state
+
+            # Moving sideways, stop where a wall ends above or below
+            if dc:
+                if ((self.open(row - 1, col) and not self.open(row - 1, col - dc))
+                        or (self.open(row + 1, col) and not self.open(row + 1, col - dc))):
+                    return state
+
+            # Moving vertically, stop where a wall ends to either side, or
+            # where a sideways jump would find a jump point
+            else:
+                if ((self.open(row, col - 1) and not self.open(row - dr, col - 1))
+                        or (self.open(row, col + 1) and not self.open(row - dr, col + 1))):
+                    return state
+                if (self.jump(state, "left") is not None
+                        or self.jump(state, "right") is not None):
+                    return state
+
+
+    def solve_jps(self, heuristic=manhattan):
+        """
+        Finds a shortest solution with jump point search: A* over the jump
+        points of the grid, skipping the symmetric paths in between.
+        """
+
+        # Keep track of number of states explored and of the frontier size
+        self.num_explored = 0
+        self.max_frontier = 0
+        self.explored = bytearray(len(self.walls))
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+        goal = self.coords(self.goal)
+        frontier = PriorityFrontier(
+            lambda node: node.cost + heuristic(self.coords(node.state), goal)
+        )
+        frontier.add(Node(state=self.start, parent=None, action=None))
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            self.max_frontier = max(self.max_frontier, len(frontier))
+            node = frontier.remove()
+            self.num_explored += 1
+
+            # Expand the straight segments between jump points into steps
+            if node.state == self.goal:
+                actions = []
+                cells = []
+                while node.parent is not None:
+                    dr, dc = DIRECTIONS[node.action]
+                    step = dr * self.width + dc
+                    state = node.state
+                    while state != node.parent.state:
+                        actions.append(node.action)
+                        cells.append(state)
+                        state -= step
+                    node = node.parent
+                actions.reverse()
+                cells.reverse()
+                self.solution = (actions, cells)
+                return
 
+            self.explored[node.state] = 1
+
+            # Only continue straight on or turn off the line of travel
+            turns = TURNS[node.action] if node.action is not None else DIRECTIONS
+            for action, _ in self.neighbors(node.state):
+                if action not in turns:
+                    continue
+                state = self.jump(node.state, action)
+                if state is None or self.explored[state]:
+                    continue
+                cost = node.cost + manhattan(self.coords(node.state), self.coords(state))
+                if frontier.contains_state(state) and frontier.cost(state) <= cost:
+                    continue
+                frontier.add(Node(state=state, parent=node, action=action, cost=cost))
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        import numpy as np
+        from PIL import Image
+
+        # Colors of walls, start, goal, solution, explored and empty cells,
+        # and of the black border drawn around every cell
+        palette = np.array([
+            (40, 40, 40, 255),
+            (255, 0, 0, 255),
+            (0, 171, 28, 255),
+            (220, 235, 113, 255),
+            (212, 97, 85, 255),
+            (237, 240, 252, 255),
+            (0, 0, 0, 255)
+        ], dtype=np.uint8)
+        WALL, START, GOAL, SOLUTION, EXPLORED, EMPTY, BORDER = range(7)
+
+        # Color index of every cell, with an extra row and column of border
+        walls = np.frombuffer(self.walls, dtype=np.uint8).astype(bool)
+        cells = np.where(walls, WALL, EMPTY).astype(np.uint8)
+        if self.solution is not None:
+            if show_explored:
+                cells[np.frombuffer(self.explored, dtype=np.uint8).astype(bool)] = EXPLORED
+            if show_solution:
+                cells[np.array(self.solution[1], dtype=np.intp)] = SOLUTION
+        cells[self.start] = START
+        cells[self.goal] = GOAL
+        grid = np.full((self.height + 1, self.width + 1), BORDER, dtype=np.uint8)
+        grid[:-1, :-1] = cells.reshape(self.height, self.width)
+
+        # Map every pixel to its cell, or to the border outside the inner
+        # square of the cell, and color the whole image in one lookup
+        def pixels(count):
+            index = np.arange(count * cell_size)
+            offset = index % cell_size
+            inside = (offset >= cell_border) & (offset <= cell_size - cell_border)
+            return np.where(inside, index // cell_size, count)
+
+        rows = pixels(self.height)
+        cols = pixels(self.width)
+        img = Image.fromarray(palette[grid[rows[:, None], cols[None, :]]])
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+if __name__ == "__main__":
+    if len(sys.argv) not in [2, 3]:
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(STRATEGIES)}]")
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+    m = Maze(sys.argv[1])
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(*sys.argv[2:])
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
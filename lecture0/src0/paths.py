@@ -0,0 +1,159 @@
+from array import array
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from maze import Maze, OPPOSITE
+
+
+class PathServer():
+    """
+    Answers many shortest path queries on one maze. Queries are
+    (start, goal) pairs of cell ids, see Maze.cell.
+    """
+
+    def __init__(self, filename, cache_size=64):
+        self.filename = filename
+        self.maze = Maze(filename)
+
+        # BFS distance fields by source cell, least recently used first
+        self.fields = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def distances(self, source):
+        """Returns the distance of every cell from source, -1 if unreachable."""
+        if source in self.fields:
+            self.hits += 1
+            self.fields.move_to_end(source)
+            return self.fields[source]
+        self.misses += 1
+
+        # Breadth-first flood fill, with the neighbor arithmetic of
+        # Maze.neighbors inlined since it runs once per cell
+        walls = self.maze.walls
+        width = self.maze.width
+        last = len(walls) - width
+        field = array("i", [-1]) * len(walls)
+        field[source] = 0
+        queue = deque([source])
+        while queue:
+            state = queue.popleft()
+            distance = field[state] + 1
+            col = state % width
+            for neighbor, inside in (
+                (state - width, state >= width),
+                (state + width, state < last),
+                (state - 1, col > 0),
+                (state + 1, col < width - 1)
+            ):
+                if inside and field[neighbor] == -1 and not walls[neighbor]:
+                    field[neighbor] = distance
+                    queue.append(neighbor)
+
+        self.fields[source] = field
+        if len(self.fields) > self.cache_size:
+            self.fields.popitem(last=False)
+        return field
+
+    def descend(self, field, state):
+        """Returns the steps from state down to the source of field."""
+        if field[state] == -1:
+            raise Exception("no solution")
+        steps = []
+        while field[state] > 0:
+            for action, neighbor in self.maze.neighbors(state):
+                if field[neighbor] == field[state] - 1:
+                    steps.append((action, neighbor))
+                    state = neighbor
+                    break
+        return steps
+
+    def query(self, start, goal):
+        """
+        Returns the (actions, cells) of a shortest path from start to goal,
+        reusing a cached distance field from either end when there is one.
+        """
+
+        # Walk down a field from the goal, then reverse the steps
+        if start in self.fields or goal not in self.fields:
+            steps = self.descend(self.distances(start), goal)
+            states = [goal] + [state for _, state in steps]
+            actions = [OPPOSITE[action] for action, _ in reversed(steps)]
+            return actions, states[-2::-1]
+
+        # Walk down the goal's field straight from the start
+        steps = self.descend(self.distances(goal), start)
+        return [action for action, _ in steps], [state for _, state in steps]
+
+    def groups(self, queries):
+        """
+        Groups query indexes by the end they should be answered from: an end
+        already cached, or else the end shared by the most queries.
+        """
+        counts = Counter(end for query in queries for end in query)
+        groups = {}
+        for index, (start, goal) in enumerate(queries):
+            if start in self.fields:
+                source = start
+            elif goal in self.fields:
+                source = goal
+            else:
+                source = start if counts[start] >= counts[goal] else goal
+            groups.setdefault(source, []).append(index)
+        return groups
+
+    def answer(self, source, queries):
+        """Answers queries that share the source end, None if unsolvable."""
+        self.distances(source)
+        results = []
+        for start, goal in queries:
+            try:
+                results.append(self.query(start, goal))
+            except Exception as e:
+                if str(e) != "no solution":
+                    raise
+                results.append(None)
+        return results
+
+    def batch(self, queries, processes=None):
+        """
+        Answers a list of (start, goal) queries, returning a list of
+        (actions, cells) solutions, or None where there is no path. With
+        processes, query groups are spread over a process pool, each worker
+        loading the maze once.
+        """
+        queries = list(queries)
+        results = [None] * len(queries)
+        groups = self.groups(queries)
+
+        if processes is None:
+            for source, indexes in groups.items():
+                answers = self.answer(source, [queries[i] for i in indexes])
+                for i, answer in zip(indexes, answers):
+                    results[i] = answer
+            return results
+
+        with ProcessPoolExecutor(processes, initializer=init_worker,
+                                 initargs=(self.filename,)) as pool:
+            futures = {
+                pool.submit(worker_answer, source, [queries[i] for i in indexes]): indexes
+                for source, indexes in groups.items()
+            }
+            for future, indexes in futures.items():
+                for i, result in zip(indexes, future.result()):
+                    results[i] = result
+        return results
+
+
+# Path server of each worker process
+worker = None
+
+
+def init_worker(filename):
+    global worker
+    worker = PathServer(filename)
+
+
+def worker_answer(source, queries):
+    return worker.answer(source, queries)
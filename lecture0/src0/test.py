@@ -0,0 +1,67 @@
+import os
+import random
+import tempfile
+
+from maze import Maze
+
+MAZES = ["maze1.txt", "maze2.txt", "maze3.txt"]
+
+
+def random_maze(height, width, density, seed):
+    """Writes a random maze to a temporary file and returns its path."""
+    rng = random.Random(seed)
+    grid = [["#" if rng.random() < density else " " for _ in range(width)]
+            for _ in range(height)]
+    (ai, aj), (bi, bj) = rng.sample(
+        [(i, j) for i in range(height) for j in range(width)], 2
+    )
+    grid[ai][aj] = "A"
+    grid[bi][bj] = "B"
+
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join("".join(row) for row in grid))
+    return path
+
+
+def path_length(maze, strategy):
+    """Returns the length of the path strategy finds, or None if there is none."""
+    try:
+        maze.solve(strategy)
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        return None
+
+    # Every step must be a legal move between neighbors
+    state = maze.start
+    for step in zip(*maze.solution):
+        assert step in maze.neighbors(state)
+        state = step[1]
+    assert state == maze.goal
+    return len(maze.solution[0])
+
+
+def test_jps_optimal_on_checked_in_mazes():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for filename in MAZES:
+        maze = Maze(os.path.join(directory, filename))
+        assert path_length(maze, "jps") == path_length(maze, "bfs")
+
+
+def test_jps_optimal_on_random_mazes():
+    for seed in range(500):
+        rng = random.Random(seed)
+        path = random_maze(rng.randint(2, 30), rng.randint(2, 30),
+                           rng.choice([0.1, 0.25, 0.4]), seed)
+        try:
+            maze = Maze(path)
+        finally:
+            os.remove(path)
+        assert path_length(maze, "jps") == path_length(maze, "bfs")
+
+
+if __name__ == "__main__":
+    test_jps_optimal_on_checked_in_mazes()
+    test_jps_optimal_on_random_mazes()
+    print("ok")
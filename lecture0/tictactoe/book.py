@@ -0,0 +1,47 @@
+"""
+Builds the Tic Tac Toe opening book: solves every reachable position once
+and writes its best cell to book.bin, which tictactoe.py loads on import.
+
+Usage: python book.py
+"""
+
+import tictactoe as ttt
+
+
+def reachable():
+    """
+    Returns every state reachable from the empty board by legal play.
+    """
+    states = set()
+    stack = [0]
+    while stack:
+        state = stack.pop()
+        if state in states: continue
+        states.add(state)
+        if not ttt.state_terminal(state):
+            for cell in ttt.state_actions(state):
+                stack.append(ttt.state_result(state, cell))
+    return states
+
+
+def build():
+    """
+    Returns the opening book: the best cell of every reachable unfinished
+    position at its base-3 index, NO_MOVE everywhere else.
+    """
+    table = bytearray([ttt.NO_MOVE]) * 3 ** 9
+    for state in reachable():
+        if ttt.state_terminal(state): continue
+        if ttt.state_player(state) == ttt.X:
+            _, cell = ttt.maxValue(state)
+        else:
+            _, cell = ttt.minValue(state)
+        table[ttt.encode(state)] = cell
+    return bytes(table)
+
+
+if __name__ == "__main__":
+    table = build()
+    with open(ttt.BOOK_FILE, "wb") as f:
+        f.write(table)
+    print(f"Wrote {sum(cell != ttt.NO_MOVE for cell in table)} positions to {ttt.BOOK_FILE}")
@@ -1,3 +1,8 @@
 class InvalidMoveException(Exception):
     "This move is not allowed"
+    pass
+
+
+class SearchTimeout(Exception):
+    "The search ran out of its time budget"
     pass
\ No newline at end of file
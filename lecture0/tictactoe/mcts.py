@@ -0,0 +1,151 @@
+"""
+Monte Carlo Tree Search player for Tic Tac Toe, and for any game with the
+same player, actions, result, winner and terminal functions
+"""
+
+import math
+import random
+import time
+
+import tictactoe as ttt
+
+
+def board_key(board):
+    """Returns a board if it is hashable, otherwise the tuple of its rows."""
+    try:
+        hash(board)
+        return board
+    except TypeError:
+        return tuple(map(tuple, board))
+
+
+class Node():
+    """
+    A position in the search tree. wins counts the playouts through it won
+    by the player who made the move into it, with draws as half a win.
+    """
+
+    def __init__(self, board, parent, action, untried):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.untried = untried
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+    """
+    Plays by Monte Carlo Tree Search with UCT selection. Each move runs
+    playouts until the playout budget or the time budget in seconds runs
+    out, whichever comes first, and plays the most visited move.
+
+    The tree is kept between moves: the next search starts from the node of
+    the position reached, with the statistics of the playouts through it.
+    Positions are matched by key(board), which by default is the board
+    itself if it is hashable, like the integer states of mnk.Game, and the
+    tuple of its rows otherwise.
+    """
+
+    def __init__(self, game=ttt, playouts=1000, budget=None,
+                 exploration=math.sqrt(2), key=None, seed=None):
+        if playouts is None and budget is None:
+            raise ValueError("MCTS needs a playout or time budget")
+        self.game = game
+        self.playouts = playouts
+        self.budget = budget
+        self.exploration = exploration
+        self.key = key if key is not None else board_key
+        self.random = random.Random(seed)
+        self.root = None
+
+        # Playouts run by every search so far, and the root visits reused
+        self.counters = {"playouts": 0, "reused": 0}
+
+    def node(self, board, parent=None, action=None):
+        """Returns a new node for a board, with its moves in random order."""
+        untried = [] if self.game.terminal(board) else list(self.game.actions(board))
+        self.random.shuffle(untried)
+        return Node(board, parent, action, untried)
+
+    def find(self, board):
+        """
+        Returns the node of a board from the previous search's tree, looking
+        at the old root and the two moves after it, or a new node.
+        """
+        key = self.key(board)
+        nodes = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in nodes:
+                if self.key(node.board) == key:
+                    node.parent = None
+                    self.counters["reused"] += node.visits
+                    return node
+            nodes = [child for node in nodes for child in node.children.values()]
+        return self.node(board)
+
+    def select(self, node):
+        """Returns the child of a node with the highest UCT score."""
+        log_visits = math.log(node.visits)
+        return max(
+            node.children.values(),
+            key=lambda child: child.wins / child.visits
+            + self.exploration * math.sqrt(log_visits / child.visits)
+        )
+
+    def playout(self, board):
+        """Plays random moves from a board to the end, and returns the winner."""
+        game = self.game
+        while not game.terminal(board):
+            board = game.result(board, self.random.choice(list(game.actions(board))))
+        return game.winner(board)
+
+    def iterate(self, root):
+        """
+        Runs one playout: walks down the tree by UCT, adds one untried move,
+        plays randomly to the end and backs the result up the path.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = self.select(node)
+
+        if node.untried:
+            action = node.untried.pop()
+            child = self.node(self.game.result(node.board, action), node, action)
+            node.children[action] = child
+            node = child
+
+        winner = self.playout(node.board)
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                mover = self.game.player(node.parent.board)
+                if winner == mover:
+                    node.wins += 1
+                elif winner is None:
+                    node.wins += 0.5
+            node = node.parent
+        self.counters["playouts"] += 1
+
+    def minimax(self, board):
+        """
+        Returns the best action for the current player on the board, found
+        within the playout and time budgets.
+        """
+        if self.game.terminal(board):
+            return None
+        root = self.root = self.find(board)
+        deadline = time.perf_counter() + self.budget if self.budget is not None else None
+
+        playouts = 0
+        while self.playouts is None or playouts < self.playouts:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self.iterate(root)
+            playouts += 1
+
+        # A budget too small for any playout still has to return a move
+        if not root.children:
+            return root.untried[-1]
+        return max(root.children.values(), key=lambda child: child.visits).action
@@ -0,0 +1,370 @@
+"""
+m,n,k-game player: Tic Tac Toe on an m x n board, won by k in a row
+"""
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from cst_exceptions import SearchTimeout
+from tictactoe import X, O, EMPTY
+
+# Score of a won game, before scaling by the empty cells left; heuristic
+# scores of unfinished games always stay below it
+WIN = 10 ** 9
+
+
+class Game():
+    """
+    Rules and search for one board shape. States are immutable integers
+    x | o << (m * n), where x and o are masks of the cells held by each
+    player and cell (i, j) is bit i * n + j, as in tictactoe's bitboards.
+
+    With workers, the moves at the root of every search are split across a
+    pool of that many processes; call close() to shut the pool down.
+    """
+
+    def __init__(self, m=3, n=3, k=3, radius=None, workers=None):
+        if not 1 <= k <= max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.size = m * n
+        self.full = (1 << self.size) - 1
+
+        # Masks of every k cells in a row, and the ones through each cell
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    if 0 <= i + (k - 1) * di < m and 0 <= j + (k - 1) * dj < n:
+                        self.lines.append(sum(
+                            1 << ((i + s * di) * n + j + s * dj) for s in range(k)
+                        ))
+        self.lines_through = [[line for line in self.lines if line >> cell & 1]
+                              for cell in range(self.size)]
+
+        # Cells in the order the search tries them, from the center out
+        self.order = sorted(
+            range(self.size),
+            key=lambda cell: abs(cell // n - (m - 1) / 2) + abs(cell % n - (n - 1) / 2)
+        )
+
+        # With a radius, only cells that close to a taken cell are searched,
+        # which keeps the branching factor of large boards manageable
+        self.radius = radius
+        self.near = [
+            sum(1 << (a * n + b)
+                for a in range(max(0, i - radius), min(m, i + radius + 1))
+                for b in range(max(0, j - radius), min(n, j + radius + 1)))
+            for i in range(m) for j in range(n)
+        ] if radius is not None else None
+
+        self.nodes = 0
+        self.deadline = None
+
+        # Best root score found so far, shared with the worker processes
+        self.workers = workers
+        self.pool = None
+        self.bound = None
+        if workers is not None:
+            self.bound = multiprocessing.Value("d", 0.0)
+            self.pool = ProcessPoolExecutor(
+                workers, initializer=init_worker,
+                initargs=(m, n, k, radius, self.bound)
+            )
+
+    def close(self):
+        """Shuts down the worker pool, if there is one."""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def initial_state(self):
+        """Returns starting state of the board."""
+        return 0
+
+    def taken(self, state):
+        """Returns the mask of the cells either player holds."""
+        return (state | state >> self.size) & self.full
+
+    def player(self, state):
+        """Returns player who has the next turn in a state."""
+        x, o = state & self.full, state >> self.size
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, state):
+        """Returns the list of empty cells in a state, in search order."""
+        taken = self.taken(state)
+        if self.near is not None and taken:
+            nearby = 0
+            for cell in range(self.size):
+                if taken >> cell & 1:
+                    nearby |= self.near[cell]
+            return [cell for cell in self.order
+                    if nearby >> cell & 1 and not taken >> cell & 1]
+        return [cell for cell in self.order if not taken >> cell & 1]
+
+    def result(self, state, cell):
+        """Returns the state that results from the next player taking a cell."""
+        if self.taken(state) >> cell & 1:
+            raise ValueError
+        if self.player(state) == X:
+            return state | 1 << cell
+        return state | 1 << (cell + self.size)
+
+    def winner(self, state, last=None):
+        """
+        Returns the winner in a state, if there is one. If the last cell
+        played is given, only the lines through it are checked.
+        """
+        x, o = state & self.full, state >> self.size
+        for line in self.lines if last is None else self.lines_through[last]:
+            if x & line == line:
+                return X
+            if o & line == line:
+                return O
+        return None
+
+    def terminal(self, state):
+        """Returns True if the game in a state is over, False otherwise."""
+        return self.taken(state) == self.full or self.winner(state) is not None
+
+    def utility(self, state):
+        """Returns 1 if X has won the game, -1 if O has won, 0 otherwise."""
+        match self.winner(state):
+            case "X": return 1
+            case "O": return -1
+        return 0
+
+    def to_bits(self, board):
+        """Returns the state of an m x n board of X, O and EMPTY."""
+        state = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    state |= 1 << (i * self.n + j)
+                elif cell == O:
+                    state |= 1 << (i * self.n + j + self.size)
+        return state
+
+    def to_board(self, state):
+        """Returns the m x n board of a state."""
+        board = [[EMPTY] * self.n for _ in range(self.m)]
+        for cell in range(self.size):
+            if state >> cell & 1:
+                board[cell // self.n][cell % self.n] = X
+            elif state >> (cell + self.size) & 1:
+                board[cell // self.n][cell % self.n] = O
+        return board
+
+    def score(self, state, last=None):
+        """
+        Returns the score of a finished game, or None if the game is not
+        over. Wins are scaled by the number of empty cells left plus one, so
+        that quicker wins and slower losses score better.
+        """
+        taken = self.taken(state)
+        empty = self.size - taken.bit_count()
+        match self.winner(state, last):
+            case "X": return WIN * (empty + 1)
+            case "O": return -WIN * (empty + 1)
+        if empty == 0:
+            return 0
+        return None
+
+    def evaluate(self, state):
+        """
+        Returns a heuristic score for an unfinished game: every line only
+        one player has pieces on counts for that player, ten times more for
+        each extra piece on it.
+        """
+        x, o = state & self.full, state >> self.size
+        value = 0
+        for line in self.lines:
+            if not o & line:
+                if x & line:
+                    value += 10 ** ((x & line).bit_count() - 1)
+            elif not x & line:
+                value -= 10 ** ((o & line).bit_count() - 1)
+        return value
+
+    def search(self, state, depth, alpha, beta, last=None):
+        """
+        Returns the best score the player to move can reach from a state
+        within depth moves, and the cell that reaches it, by alpha-beta
+        search. Positions at the depth limit get their heuristic score.
+        """
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes % 256 == 0
+                and time.perf_counter() > self.deadline):
+            raise SearchTimeout
+
+        value = self.score(state, last)
+        if value is not None:
+            return value, None
+        if depth == 0:
+            return self.evaluate(state), None
+
+        maximizing = self.player(state) == X
+        best = (-math.inf, None) if maximizing else (math.inf, None)
+        for cell in self.actions(state):
+            value, _ = self.search(self.result(state, cell), depth - 1,
+                                   alpha, beta, cell)
+            if maximizing:
+                if value > best[0]:
+                    best = (value, cell)
+                alpha = max(alpha, value)
+            else:
+                if value < best[0]:
+                    best = (value, cell)
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return best
+
+    def best_move(self, state, budget=None, max_depth=None):
+        """
+        Returns the best cell for the player to move, by iterative
+        deepening: searches one move deeper at a time, trying the previous
+        best cell first, until the whole game is searched, max_depth is
+        reached, or the budget in seconds runs out. The move of the deepest
+        finished search is returned.
+        """
+        if self.terminal(state):
+            return None
+        cells = self.actions(state)
+        move = cells[0]
+        limit = self.size - self.taken(state).bit_count()
+        if max_depth is not None:
+            limit = min(limit, max_depth)
+
+        self.deadline = time.perf_counter() + budget if budget is not None else None
+        try:
+            for depth in range(1, limit + 1):
+                value, move = self.search_root(state, cells, depth)
+                cells.remove(move)
+                cells.insert(0, move)
+
+                # A forced win or loss will not change with more depth
+                if abs(value) >= WIN:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return move
+
+    def search_root(self, state, cells, depth):
+        """Searches every cell of a state in order, returning the best."""
+        if self.pool is not None:
+            return self.search_root_parallel(state, cells, depth)
+
+        maximizing = self.player(state) == X
+        alpha, beta = -math.inf, math.inf
+        best = (-math.inf, None) if maximizing else (math.inf, None)
+        for cell in cells:
+            value, _ = self.search(self.result(state, cell), depth - 1,
+                                   alpha, beta, cell)
+            if maximizing and value > best[0]:
+                best = (value, cell)
+                alpha = value
+            elif not maximizing and value < best[0]:
+                best = (value, cell)
+                beta = value
+        return best
+
+    def search_root_parallel(self, state, cells, depth):
+        """
+        Searches every cell of a state in the worker pool, returning the
+        same best cell as search_root: the first cell in order with the
+        best score.
+        """
+        maximizing = self.player(state) == X
+        with self.bound.get_lock():
+            self.bound.value = -math.inf if maximizing else math.inf
+
+        # Workers need a deadline on the wall clock, which all processes share
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.time() + self.deadline - time.perf_counter()
+
+        futures = [
+            self.pool.submit(search_cell, state, cell, depth, maximizing, deadline)
+            for cell in cells
+        ]
+        scores = []
+        try:
+            for future in futures:
+                value, nodes = future.result()
+                self.nodes += nodes
+                scores.append(value)
+        except SearchTimeout:
+
+            # Cells already running or queued cannot be cancelled, and would
+            # share their scores into the bound of the next search
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+        # Ties go to the earliest cell, as in the serial search
+        if maximizing:
+            value = max(scores)
+        else:
+            value = min(scores)
+        return value, cells[scores.index(value)]
+
+    def minimax(self, board, budget=1.0, max_depth=None):
+        """
+        Returns the best action (i, j) for the current player on the board,
+        found within the budget in seconds.
+        """
+        cell = self.best_move(self.to_bits(board), budget, max_depth)
+        return divmod(cell, self.n) if cell is not None else None
+
+
+# Game and shared root bound of each worker process
+worker_game = None
+worker_bound = None
+
+
+def init_worker(m, n, k, radius, bound):
+    global worker_game, worker_bound
+    worker_game = Game(m, n, k, radius)
+    worker_bound = bound
+
+
+def search_cell(state, cell, depth, maximizing, deadline):
+    """
+    Searches one root cell in a worker process, and returns its score and
+    the number of nodes searched. The window starts just short of the best
+    root score any worker has found, so that cells scoring as well as it are
+    still scored exactly and the earliest of them can be picked.
+    """
+    game = worker_game
+    game.nodes = 0
+    game.deadline = None
+    if deadline is not None:
+        game.deadline = time.perf_counter() + deadline - time.time()
+
+    bound = worker_bound.value
+    if maximizing:
+        alpha, beta = bound - 1, math.inf
+    else:
+        alpha, beta = -math.inf, bound + 1
+    try:
+        value, _ = game.search(game.result(state, cell), depth - 1, alpha, beta, cell)
+    finally:
+        game.deadline = None
+
+    # Share the score if it is exact, that is inside the window
+    if alpha < value < beta:
+        with worker_bound.get_lock():
+            if maximizing:
+                worker_bound.value = max(worker_bound.value, value)
+            else:
+                worker_bound.value = min(worker_bound.value, value)
+    return value, game.nodes
@@ -1,6 +1,7 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
@@ -19,12 +20,19 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches on a worker thread, so the window keeps drawing and
+# handling events while the computer thinks; ai_move is the future of the
+# move being searched, polled every frame
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+ai_started = 0
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -110,13 +118,14 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = executor.submit(ttt.minimax, board)
+                ai_started = time.time()
+
+            # Play the move once it is found, but no sooner than half a second
+            elif ai_move.done() and time.time() - ai_started >= 0.5:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +150,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_move = None
 
     pygame.display.flip()
@@ -0,0 +1,202 @@
+"""
+Headless Tic Tac Toe self-play: plays games between two engines and reports
+results, search speed, move latency and transposition table hit rates.
+
+Usage: python selfplay.py [--x ENGINE] [--o ENGINE] [--games N] [--seed S]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import tictactoe as ttt
+from mcts import MCTS
+from mnk import Game
+
+ENGINES = ("minimax", "search", "cold", "mnk", "mcts", "random")
+
+# Engines that play perfectly, so games between two of them must be drawn
+PERFECT = {"minimax", "search", "cold", "mnk"}
+
+
+class Engine():
+    """
+    A named move function with the statistics of the moves it made. move
+    takes a board and returns (action, nodes searched, table hits). For
+    engines that reuse search trees, hits counts reused visits instead.
+    """
+
+    def __init__(self, name, move, reuse=False):
+        self.name = name
+        self.move = move
+        self.reuse = reuse
+        self.latencies = []
+        self.nodes = 0
+        self.hits = 0
+
+    def play(self, board):
+        start = time.perf_counter()
+        action, nodes, hits = self.move(board)
+        self.latencies.append(time.perf_counter() - start)
+        self.nodes += nodes
+        self.hits += hits
+        return action
+
+
+def counted(search):
+    """
+    Wraps a move function that searches with the tictactoe module, so that
+    it searches with a transposition table of its own and reports the nodes
+    and table hits from ttt.counters.
+    """
+    table = {}
+
+    def move(board):
+        nodes, hits = ttt.counters["nodes"], ttt.counters["hits"]
+        saved, ttt.table = ttt.table, table
+        try:
+            action = search(board)
+        finally:
+            ttt.table = saved
+        return (action, ttt.counters["nodes"] - nodes,
+                ttt.counters["hits"] - hits)
+    return move
+
+
+def table_search(board):
+    """
+    Returns the alpha-beta search move, with the table but without the book.
+    """
+    state = ttt.to_bits(board)
+    if ttt.state_player(state) == ttt.X:
+        _, cell = ttt.maxValue(state)
+    else:
+        _, cell = ttt.minValue(state)
+    return divmod(cell, 3)
+
+
+def cold_search(board):
+    """
+    Returns the alpha-beta search move, starting from an empty table.
+    """
+    ttt.table.clear()
+    return table_search(board)
+
+
+def mnk_engine():
+    """Returns a move function searching with a Game of its own."""
+    game = Game(3, 3, 3)
+
+    def move(board):
+        nodes = game.nodes
+        action = game.minimax(board, budget=None)
+        return action, game.nodes - nodes, 0
+    return move
+
+
+def mcts_engine(seed):
+    """
+    Returns a move function searching with a tree of its own, which counts
+    playouts as positions and the visits kept from the last tree as hits.
+    """
+    tree = MCTS(playouts=2000, seed=seed)
+
+    def move(board):
+        playouts, reused = tree.counters["playouts"], tree.counters["reused"]
+        action = tree.minimax(board)
+        return (action, tree.counters["playouts"] - playouts,
+                tree.counters["reused"] - reused)
+    return move
+
+
+def engines(seed=None):
+    """
+    Returns a function that builds a fresh engine by name, with tables,
+    trees and games of its own.
+    """
+    rng = random.Random(seed)
+
+    def build(name):
+        if name == "minimax":
+            return Engine(name, counted(ttt.minimax))
+        if name == "search":
+            return Engine(name, counted(table_search))
+        if name == "cold":
+            return Engine(name, counted(cold_search))
+        if name == "mnk":
+            return Engine(name, mnk_engine())
+        if name == "mcts":
+            return Engine(name, mcts_engine(rng.random()), reuse=True)
+        if name == "random":
+            choose = random.Random(rng.random()).choice
+            return Engine(name, lambda board: (choose(sorted(ttt.actions(board))), 0, 0))
+        raise ValueError(f"unknown engine {name}")
+    return build
+
+
+def play(x, o):
+    """
+    Plays one game between the engines x and o, and returns the winner.
+    """
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        engine = x if ttt.player(board) == ttt.X else o
+        board = ttt.result(board, engine.play(board))
+    return ttt.winner(board)
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values, by nearest rank.
+    """
+    values = sorted(values)
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+def report(engine):
+    """
+    Returns a line of statistics about the moves an engine made.
+    """
+    seconds = sum(engine.latencies)
+    rate = engine.nodes / seconds if seconds else 0
+    hit_rate = engine.hits / engine.nodes if engine.nodes else 0
+    p50, p90, p99 = (percentile(engine.latencies, p) * 1000 for p in (50, 90, 99))
+
+    # Reused visits are counted again every time a tree is reused, so they
+    # are no hit rate and can exceed one per playout
+    if engine.reuse:
+        hits = f"reused visits per playout {hit_rate:.2f}"
+    else:
+        hits = f"table hit rate {hit_rate:.1%}"
+    return (f"{engine.name}: {len(engine.latencies)} moves, "
+            f"{engine.nodes} positions ({rate:.0f}/s), "
+            f"latency p50 {p50:.3f} ms p90 {p90:.3f} ms p99 {p99:.3f} ms, "
+            f"{hits}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe engines against each other.")
+    parser.add_argument("--x", choices=ENGINES, default="minimax", help="engine playing X")
+    parser.add_argument("--o", choices=ENGINES, default="minimax", help="engine playing O")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    build = engines(args.seed)
+    x, o = build(args.x), build(args.o)
+    results = {ttt.X: 0, ttt.O: 0, None: 0}
+    for _ in range(args.games):
+        results[play(x, o)] += 1
+
+    print(f"X ({x.name}) wins: {results[ttt.X]}, "
+          f"O ({o.name}) wins: {results[ttt.O]}, draws: {results[None]}")
+    print(report(x))
+    print(report(o))
+
+    if x.name in PERFECT and o.name in PERFECT and results[None] != args.games:
+        sys.exit("Perfect play did not end in a draw")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
 
 
 
@@ -16,7 +16,7 @@ class Node():
         self.state = state
         self.parent = parent
         self.action = action
-        
+
 
 
 def initial_state():
@@ -33,11 +33,7 @@ def player(board):
     Returns player who has the next turn on a board.
     """
 
-    x_count = [i for sub in board for i in sub].count(X)
-    o_count = [i for sub in board for i in sub].count(O)
-
-    if x_count == o_count: return X
-    else: return O
+    return state_player(to_bits(board))
 
 
 
@@ -47,26 +43,19 @@ def actions(board):
     Returns set of all possible actions (i, j) available on the board.
     """
 
-    actions = set()
-    actions = {(i,j) for i,sub in enumerate(board,0) for j,v in enumerate(sub,0) if v == EMPTY}
+    return {divmod(k, 3) for k in state_actions(to_bits(board))}
 
-    return actions
 
-    
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board_new = copy.deepcopy(board) 
 
     if action not in actions(board=board): raise ValueError
 
-    board_new[action[0]][action[1]] = player(board=board)
-
-    
-    return board_new
+    return to_board(state_result(to_bits(board), 3 * action[0] + action[1]))
 
 
 def winner(board):
@@ -74,37 +63,7 @@ def winner(board):
     Returns the winner of the game, if there is one.
     """
 
-    curr_player = player(board=board)
-    match curr_player:
-        case "X": curr_player = "O"
-        case "O": curr_player = "X"
-
-
-    diag1, diag2 = [],[]
-    #check horizontal and vertical win
-    for i,row in enumerate(board):
-        
-        #check horizontal
-        row_check = [c for c in row if c == curr_player]
-        if len(row_check) == 3: return curr_player
-
-        #check vertical
-        col_check = []
-        for j in range(3):
-            
-            if board[j][i] == curr_player: 
-                col_check.append(board[j][i])
-
-        if len(col_check) == 3: return curr_player
-        
-        #check diagonal
-        
-        if board[i][i] == curr_player: diag1.append(curr_player)
-        if board[len(row)-1-i][i] == curr_player: diag2.append(curr_player)
-
-    if len(diag1) == 3 or len(diag2) == 3: return curr_player
-
-    return None
+    return state_winner(to_bits(board))
 
 
 
@@ -112,7 +71,7 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    return (False if winner(board) == None and len(actions(board)) > 0 else True)
+    return state_terminal(to_bits(board))
 
 
 
@@ -120,17 +79,17 @@ def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    
+
     if terminal(board):
         winner_util = winner(board)
-        
+
         match winner_util:
             case "X": winner_util = 1
             case "O": winner_util = -1
             case None: winner_util = 0
 
         return winner_util
-    
+
     return False
 
 
@@ -144,79 +103,291 @@ def minimax(board):
     #If the board is empty, open with a random move
     if board == initial_state(): return actions(board).pop()
 
-    actions_opt = []
-    recommended_action = ()
+    state = to_bits(board)
 
+    # Look the move up in the opening book, if it has been built
+    if book and book[encode(state)] != NO_MOVE:
+        counters["nodes"] += 1
+        counters["hits"] += 1
+        return divmod(book[encode(state)], 3)
 
-    if player(board) == "X": 
-        utility_opt, actions_opt, d = maxValue(board)
-    else: 
-        utility_opt, actions_opt, d = minValue(board)
-    
-    if len(actions_opt) > 0: 
-        min_moves = 99
-        recommended_action = ()
+    if state_player(state) == X:
+        _, recommended_action = maxValue(state)
+    else:
+        _, recommended_action = minValue(state)
 
-        for a in actions_opt:
-            if a[1] < min_moves:
-                min_moves = a[1]
-                recommended_action = a[0]
-        
-    else: 
-        print("choosing anything")
-        recommended_action = actions(board).pop()
+    return divmod(recommended_action, 3)
 
-    
-    
-    return recommended_action
 
+# Bitboards: a state is the immutable integer x | o << 9, where x and o are
+# 9-bit masks of the cells held by each player and cell (i, j) is bit 3i + j
+FULL = 0b111111111
 
-def maxValue(board, d=0):
+# Masks of the 8 lines that win the game: rows, columns and diagonals
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
 
-    value = -2
-    actionValues = []
+# Cells in the order the search tries them: center, corners, then edges
+ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+
+def to_bits(board):
+    """
+    Returns the bitboard state of a board.
+    """
+    state = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X: state |= 1 << (3 * i + j)
+            elif cell == O: state |= 1 << (3 * i + j + 9)
+    return state
+
+
+def to_board(state):
+    """
+    Returns the board of a bitboard state.
+    """
+    board = initial_state()
+    for k in range(9):
+        if state >> k & 1: board[k // 3][k % 3] = X
+        elif state >> (k + 9) & 1: board[k // 3][k % 3] = O
+    return board
 
-    di = d + 1
-    if terminal(board):
-        
-        return utility(board), actionValues, d
 
-    
-    for a in actions(board):
-        
-        min_val = minValue(result(board, a), d = di)
-        value = max(value, min_val[0])
+def state_player(state):
+    """
+    Returns player who has the next turn in a state.
+    """
+    x, o = state & FULL, state >> 9
+    return X if x.bit_count() == o.bit_count() else O
 
-        # recommended action will always take first in action array. so optimal solutions are inserted ad pos 0, draw-solutions at the end. 
-        if value == 1: 
-            actionValues.insert(0,[a, min_val[2]])
-            break
-        elif value == 0: actionValues.append([a, 0])
 
-    return value, actionValues, min_val[2]
+def state_actions(state):
+    """
+    Returns the list of empty cells in a state, in search ORDER.
+    """
+    empty = FULL & ~(state | state >> 9)
+    return [k for k in ORDER if empty >> k & 1]
 
 
-def minValue(board, d=0):
-    
-    value = 2
-    actionValues = []
+def state_result(state, cell):
+    """
+    Returns the state that results from the next player taking a cell.
+    """
+    if (state | state >> 9) >> cell & 1: raise ValueError
+    if state_player(state) == X: return state | 1 << cell
+    return state | 1 << (cell + 9)
 
-    di = d + 1
-    if terminal(board):
-        return utility(board), actionValues, d
-    
-    
-    for a in actions(board):
-        min_val = maxValue(result(board, a), d = di)
-        value = min(value, min_val[0])
-        
-        # recommended action will always take first in action array. so optimal solutions are inserted ad pos 0, draw-solutions at the end. 
-        if value == -1: 
-            actionValues.insert(0,[a,min_val[2]])
-            break
-        elif value == 0: actionValues.append([a, 0])
-
-    return value, actionValues, min_val[2]
+
+def state_winner(state):
+    """
+    Returns the winner in a state, if there is one.
+    """
+    x, o = state & FULL, state >> 9
+    for line in LINES:
+        if x & line == line: return X
+        if o & line == line: return O
+    return None
+
+
+def state_terminal(state):
+    """
+    Returns True if the game in a state is over, False otherwise.
+    """
+    return (state | state >> 9) & FULL == FULL or state_winner(state) is not None
+
+
+# Transposition table of every position searched so far, mapping the
+# canonical state of a position to its (score, best cell, bound), with the
+# cell given on the canonical board. The bound says whether the score is
+# EXACT, or only a LOWER or UPPER bound left by an alpha-beta cutoff. It
+# lives as long as the module, so repeated minimax calls become lookups once
+# the game tree has been searched.
+table = {}
+EXACT, LOWER, UPPER = "exact", "lower", "upper"
+
+# Search counters: nodes visited and nodes answered from the table or the
+# opening book
+counters = {"nodes": 0, "hits": 0}
+
+# The 8 rotations and reflections of the board, as maps of a cell (i, j) to
+# the cell it moves to
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i)
+]
+
+# Where each symmetry moves each cell index, and each of the 512 masks
+CELLS = [[3 * s(k // 3, k % 3)[0] + s(k // 3, k % 3)[1] for k in range(9)]
+         for s in SYMMETRIES]
+MASKS = []
+for cells in CELLS:
+
+    # Masks with bits 0..k-1 are doubled up into masks with bit k as well
+    masks = [0]
+    for k in range(9): masks += [mask | 1 << cells[k] for mask in masks]
+    MASKS.append(masks)
+
+# Index of the symmetry that undoes each symmetry
+INVERSES = [
+    next(t for t in range(len(SYMMETRIES))
+         if all(CELLS[t][CELLS[s][k]] == k for k in range(9)))
+    for s in range(len(SYMMETRIES))
+]
+
+
+def canonical(state):
+    """
+    Returns the smallest of the 8 symmetric versions of a state, and the
+    index of the symmetry that gives it. Symmetric states have the same
+    canonical state and the same minimax value.
+    """
+    x, o = state & FULL, state >> 9
+    return min((masks[x] | masks[o] << 9, s) for s, masks in enumerate(MASKS))
+
+
+def lookup(state, alpha, beta):
+    """
+    Returns the table entry for a state as (score, cell, usable), with its
+    cell moved back from the canonical board, or None if the state has not
+    been searched yet. The entry is usable if its score settles the state
+    within the (alpha, beta) window.
+    """
+    key, s = canonical(state)
+    if key not in table: return None
+    value, cell, bound = table[key]
+    if cell is not None: cell = CELLS[INVERSES[s]][cell]
+    usable = (bound == EXACT
+              or (bound == LOWER and value >= beta)
+              or (bound == UPPER and value <= alpha))
+    return value, cell, usable
+
+
+def store(state, value, cell, alpha, beta):
+    """
+    Stores the score and best cell of a state, searched within the
+    (alpha, beta) window, under its canonical state, and returns them.
+    """
+    if value <= alpha: bound = UPPER
+    elif value >= beta: bound = LOWER
+    else: bound = EXACT
+    key, s = canonical(state)
+    table[key] = (value, CELLS[s][cell] if cell is not None else None, bound)
+    return value, cell
+
+
+def evaluate(state):
+    """
+    Returns the score of a finished game, or None if the game is not over.
+    Wins are scaled by the number of empty cells left plus one, so that
+    quicker wins and slower losses score better.
+    """
+    x, o = state & FULL, state >> 9
+    empty = 9 - (x | o).bit_count()
+    for line in LINES:
+        if x & line == line: return empty + 1
+        if o & line == line: return -(empty + 1)
+    if empty == 0: return 0
+    return None
+
+
+def search(state, alpha, beta, maximizing):
+    """
+    Returns the best score the player to move can reach from a state and
+    the cell that reaches it, by alpha-beta search that skips any move that
+    cannot change the result within the (alpha, beta) window.
+    """
+    counters["nodes"] += 1
+
+    # Try the table first, and the best cell it remembers before the others
+    first = None
+    entry = lookup(state, alpha, beta)
+    if entry is not None:
+        value, first, usable = entry
+        if usable:
+            counters["hits"] += 1
+            return value, first
+
+    value = evaluate(state)
+    if value is not None: return store(state, value, None, alpha, beta)
+
+    cells = state_actions(state)
+    if first is not None:
+        cells.remove(first)
+        cells.insert(0, first)
+
+    window = (alpha, beta)
+    best = (-math.inf, None) if maximizing else (math.inf, None)
+    for cell in cells:
+        value, _ = search(state_result(state, cell), alpha, beta, not maximizing)
+        if maximizing:
+            if value > best[0]: best = (value, cell)
+            alpha = max(alpha, value)
+        else:
+            if value < best[0]: best = (value, cell)
+            beta = min(beta, value)
+        if alpha >= beta: break
+
+    return store(state, *best, *window)
+
+
+def maxValue(state, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the best score X can reach from a state and the cell that
+    reaches it.
+    """
+    return search(state, alpha, beta, True)
+
+
+def minValue(state, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the best score O can reach from a state and the cell that
+    reaches it.
+    """
+    return search(state, alpha, beta, False)
+
+
+# Opening book written by book.py: one byte per position, indexed by its
+# base-3 encoding, holding the best cell or NO_MOVE
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 255
+
+# Base-3 value of every 9-bit mask read as digits 0 and 1
+TERNARY = [0]
+for k in range(9): TERNARY += [value + 3 ** k for value in TERNARY]
+
+
+def encode(state):
+    """
+    Returns the index of a state in the opening book, reading its cells as
+    the base-3 digits EMPTY = 0, X = 1 and O = 2.
+    """
+    return TERNARY[state & FULL] + 2 * TERNARY[state >> 9]
+
+
+def load_book():
+    """
+    Returns the contents of the opening book, or empty bytes if it has not
+    been built or is not the size of a complete book.
+    """
+    try:
+        with open(BOOK_FILE, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return b""
+    return data if len(data) == 3 ** 9 else b""
+
+
+book = load_book()
 
 
 def print_board(board):
@@ -1,8 +1,26 @@
+import heapq
 import itertools
+import random
+
+
+def nesting(code):
+    """Returns how deeply parentheses nest in a Python expression."""
+    depth = deepest = 0
+    for c in code:
+        if c == "(":
+            depth += 1
+            deepest = max(deepest, depth)
+        elif c == ")":
+            depth -= 1
+    return deepest
 
 
 class Sentence():
 
+    # Deepest nesting compiled into one expression, well within what
+    # Python's parser accepts
+    NESTING = 100
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -15,6 +33,56 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        out, returning None if its value depends on them.
+        """
+        raise Exception("nothing to evaluate")
+
+    def code(self, index):
+        """
+        Returns a Python expression evaluating the logical sentence over a
+        sequence v of booleans, where symbol name is v[index[name]].
+        """
+        raise Exception("nothing to compile")
+
+    def closure(self, index):
+        """
+        Returns a function evaluating the logical sentence over a sequence
+        v of booleans, which calls the functions of its parts.
+        """
+        raise Exception("nothing to compile")
+
+    def function(self, index):
+        """
+        Returns a function evaluating the logical sentence over a sequence
+        v of booleans: a single Python expression, or closures over the
+        functions of its parts if that expression would nest too deeply.
+        """
+        code = self.code(index)
+        if nesting(code) <= Sentence.NESTING:
+            return eval(f"lambda v: {code}")
+        return self.closure(index)
+
+    def compile(self, symbols):
+        """
+        Returns a function that evaluates the logical sentence over a
+        sequence of booleans, one for each of symbols in order. It runs as a
+        single Python expression, with no method calls or dict lookups,
+        except for sentences nested too deeply to parse as one.
+        """
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        return self.function(index)
+
+    def vector(self, columns):
+        """
+        Evaluates the logical sentence over many models at once. columns
+        maps each symbol to a NumPy boolean array with its value in every
+        model, or to a single bool for all of them.
+        """
+        raise Exception("nothing to evaluate")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -65,6 +133,19 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
+    def partial(self, model):
+        return model.get(self.name)
+
+    def code(self, index):
+        return f"v[{index[self.name]}]"
+
+    def closure(self, index):
+        i = index[self.name]
+        return lambda v: v[i]
+
+    def vector(self, columns):
+        return columns[self.name]
+
     def symbols(self):
         return {self.name}
 
@@ -89,6 +170,21 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    def partial(self, model):
+        value = self.operand.partial(model)
+        return None if value is None else not value
+
+    def code(self, index):
+        return f"(not {self.operand.code(index)})"
+
+    def closure(self, index):
+        operand = self.operand.function(index)
+        return lambda v: not operand(v)
+
+    def vector(self, columns):
+        # Unlike ~, ^ True also negates a plain bool
+        return self.operand.vector(columns) ^ True
+
     def symbols(self):
         return self.operand.symbols()
 
@@ -126,6 +222,40 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
+    def terms(self, index):
+        """Returns the code of the conjuncts, with nested And flattened."""
+        terms = []
+        for conjunct in self.conjuncts:
+            if isinstance(conjunct, And):
+                terms.extend(conjunct.terms(index))
+            else:
+                terms.append(conjunct.code(index))
+        return terms
+
+    def code(self, index):
+        terms = self.terms(index)
+        return f"({' and '.join(terms)})" if terms else "True"
+
+    def closure(self, index):
+        conjuncts = [conjunct.function(index) for conjunct in self.conjuncts]
+        return lambda v: all(conjunct(v) for conjunct in conjuncts)
+
+    def vector(self, columns):
+        value = True
+        for conjunct in self.conjuncts:
+            value = value & conjunct.vector(columns)
+        return value
+
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
@@ -157,6 +287,40 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    def partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
+    def terms(self, index):
+        """Returns the code of the disjuncts, with nested Or flattened."""
+        terms = []
+        for disjunct in self.disjuncts:
+            if isinstance(disjunct, Or):
+                terms.extend(disjunct.terms(index))
+            else:
+                terms.append(disjunct.code(index))
+        return terms
+
+    def code(self, index):
+        terms = self.terms(index)
+        return f"({' or '.join(terms)})" if terms else "False"
+
+    def closure(self, index):
+        disjuncts = [disjunct.function(index) for disjunct in self.disjuncts]
+        return lambda v: any(disjunct(v) for disjunct in disjuncts)
+
+    def vector(self, columns):
+        value = False
+        for disjunct in self.disjuncts:
+            value = value | disjunct.vector(columns)
+        return value
+
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
@@ -188,6 +352,30 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    def partial(self, model):
+        antecedent = self.antecedent.partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
+    def code(self, index):
+        antecedent = self.antecedent.code(index)
+        return f"(not {antecedent} or {self.consequent.code(index)})"
+
+    def closure(self, index):
+        antecedent = self.antecedent.function(index)
+        consequent = self.consequent.function(index)
+        return lambda v: not antecedent(v) or consequent(v)
+
+    def vector(self, columns):
+        return ((self.antecedent.vector(columns) ^ True)
+                | self.consequent.vector(columns))
+
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
@@ -211,53 +399,668 @@ class Biconditional(Sentence):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def partial(self, model):
+        left = self.left.partial(model)
+        if left is None:
+            return None
+        right = self.right.partial(model)
+        if right is None:
+            return None
+        return left == right
 
-        # If model has an assignment for each symbol
-        if not symbols:
+    def code(self, index):
+        return f"({self.left.code(index)} == {self.right.code(index)})"
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+    def closure(self, index):
+        left = self.left.function(index)
+        right = self.right.function(index)
+        return lambda v: left(v) == right(v)
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+    def vector(self, columns):
+        return self.left.vector(columns) == self.right.vector(columns)
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    def symbols(self):
+        return set.union(self.left.symbols(), self.right.symbols())
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+class CNF():
+    """
+    Clauses of sentences in conjunctive normal form, by the Tseitin
+    transformation: every compound subsentence gets a new variable, with
+    clauses that make it equivalent to its parts, so the clauses grow
+    linearly with the sentence. Symbols are numbered from 1 in variables,
+    and a clause is a list of literals v or -v for a variable v being true
+    or false.
+    """
+
+    def __init__(self, *sentences):
+        self.variables = {}
+        self.count = 0
+        self.clauses = []
+
+        # Literal of every compound subsentence encoded so far, by id, with
+        # the sentence kept alive so that its id is not reused
+        self.literals = {}
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def variable(self, name=None):
+        """Returns the variable of a symbol, or a new auxiliary variable."""
+        if name in self.variables:
+            return self.variables[name]
+        self.count += 1
+        if name is not None:
+            self.variables[name] = self.count
+        return self.count
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, adding its clauses."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if id(sentence) in self.literals:
+            return self.literals[id(sentence)][1]
+
+        v = self.variable()
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            self.clauses.extend([[v, a], [v, -b], [-v, -a, b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.literals[id(sentence)] = (sentence, v)
+        return v
+
+    def add(self, sentence):
+        """
+        Adds the clauses that make sentence true. Conjunctions, disjunctions
+        and implications at the top are turned into clauses directly, without
+        a variable of their own.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Not):
+            self.add(sentence.operand.operand)
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Or):
+            for disjunct in sentence.operand.disjuncts:
+                self.add(Not(disjunct))
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def luby(i):
+    """Returns the i-th term of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class Solver():
+    """
+    CDCL SAT solver: DPLL search that assigns pure literals up front, finds
+    forced literals by unit propagation over two watched literals per
+    clause, and on a conflict learns a clause at the first unique
+    implication point and jumps back to the level where it becomes unit.
+
+    Decisions take the variable in the most recent conflicts from a heap,
+    with the value it last had. The search restarts after a Luby sequence
+    of conflicts, and on restarts drops half of the learned clauses whose
+    literals span the most decision levels. Every time the number of
+    restarts doubles, a local search looks for a model directly, and
+    otherwise leaves the values decisions start from at the best
+    assignment it found.
+    """
+
+    # Conflicts per unit of the Luby sequence between restarts
+    RESTART = 100
+
+    # Learned clauses kept before the first clean-up, and its growth
+    LEARNED = 2000
+    GROWTH = 1.1
+
+    # Local search flips per conflict so far, and how strongly it avoids
+    # flips that make true clauses false
+    WALK = 100
+    BREAK = 2.3
+
+    def __init__(self, clauses, count):
+        self.count = count
+        self.clauses = []
+
+        # Clauses watching each literal, with negative literals indexed from
+        # the end of the list
+        self.watches = [[] for _ in range(2 * count + 1)]
+
+        # Value, decision level and implying clause of every variable, and
+        # the value of every literal, indexed like the watches
+        self.values = [None] * (count + 1)
+        self.truth = [None] * (2 * count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.bump = 1.0
+
+        # Value each variable had last, and a heap of (-activity, variable)
+        # that holds every unassigned variable, with stale entries skipped
+        self.phases = [False] * (count + 1)
+        self.heap = [(0.0, var) for var in range(1, count + 1)]
+
+        # Learned clauses with the number of levels among their literals
+        self.learned = []
+        self.max_learned = self.LEARNED
+        self.random = random.Random(0)
+
+        # Assigned literals in order, where each decision level starts in it,
+        # and how far unit propagation has got through it
+        self.trail = []
+        self.limits = []
+        self.head = 0
+
+        # Drop repeated literals and clauses that are always true
+        self.conflict = False
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-lit in clause for lit in clause):
+                continue
+            if not clause:
+                self.conflict = True
+            self.clauses.append(clause)
+
+    def value(self, lit):
+        """Returns True or False for an assigned literal, otherwise None."""
+        return self.truth[lit]
+
+    def assign(self, lit, reason):
+        """Makes a literal true at the current level, implied by reason."""
+        var = abs(lit)
+        self.values[var] = lit > 0
+        self.truth[lit] = True
+        self.truth[-lit] = False
+        self.levels[var] = len(self.limits)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def watch(self, clause):
+        """Watches the first two literals of a clause."""
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def pure_literals(self):
+        """
+        Assigns every literal whose negation appears in no clause that is
+        not yet true, until there are none left. A pure literal can only
+        make clauses true, so assigning it keeps the clauses satisfiable.
+        """
+        clauses = self.clauses
+        while True:
+            clauses = [clause for clause in clauses
+                       if not any(self.value(lit) for lit in clause)]
+            lits = {lit for clause in clauses for lit in clause
+                    if self.value(lit) is None}
+            pure = [lit for lit in lits if -lit not in lits]
+            if not pure:
+                return
+            for lit in pure:
+                self.assign(lit, None)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with one literal left, and
+        returns a clause all of whose literals are false, or None.
+        """
+        truth = self.truth
+        watches = self.watches
+        trail = self.trail
+        while self.head < len(trail):
+            false = -trail[self.head]
+            self.head += 1
+
+            # Clauses that keep watching the false literal are copied back
+            watching = watches[false]
+            watches[false] = kept = []
+            for n, clause in enumerate(watching):
+
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if truth[first]:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if truth[lit] is not False:
+                        clause[1], clause[k] = lit, false
+                        watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if truth[first] is False:
+                        kept.extend(watching[n + 1:])
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict, with its asserting
+        literal first, and the level to jump back to. Literals of the
+        current level are resolved away, latest first, until one is left.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for lit in clause:
+                var = abs(lit)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.activity[var] += self.bump
+                    if self.activity[var] > 1e100:
+                        self.rescale()
+                    if self.levels[var] == level:
+                        pending += 1
+                    else:
+                        learned.append(lit)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(lit)]
+        learned[0] = -lit
+        self.bump *= 1.05
+
+        # Drop literals implied by the other literals of the clause
+        levels = {self.levels[abs(lit)] for lit in learned[1:]}
+        learned[1:] = [lit for lit in learned[1:]
+                       if not self.redundant(lit, seen, levels)]
+
+        # The second literal is the latest assigned, so it is watched
+        back = 0
+        for k in range(1, len(learned)):
+            if self.levels[abs(learned[k])] > back:
+                back = self.levels[abs(learned[k])]
+                learned[1], learned[k] = learned[k], learned[1]
+        return learned, back
+
+    def redundant(self, lit, seen, levels):
+        """
+        Checks if a literal of a learned clause is implied by the others:
+        if following reasons back from it only reaches literals already
+        seen in the conflict or assigned at level 0. Decisions and levels
+        not in the clause end the walk early. Literals shown to be implied
+        are added to seen, so later checks stop at them.
+        """
+        if self.reasons[abs(lit)] is None:
+            return False
+        stack = [lit]
+        added = []
+        while stack:
+            var = abs(stack.pop())
+            for other in self.reasons[var]:
+                v = abs(other)
+                if v == var or v in seen or self.levels[v] == 0:
+                    continue
+                if self.reasons[v] is None or self.levels[v] not in levels:
+                    seen.difference_update(added)
+                    return False
+                seen.add(v)
+                added.append(v)
+                stack.append(other)
+        return True
+
+    def rescale(self):
+        """Scales activities down before they overflow."""
+        self.activity = [activity * 1e-100 for activity in self.activity]
+        self.bump *= 1e-100
+        self.heap = [(-self.activity[var], var) for var in range(1, self.count + 1)
+                     if self.values[var] is None]
+        heapq.heapify(self.heap)
+
+    def backtrack(self, level):
+        """Undoes every assignment above a decision level."""
+        if len(self.limits) > level:
+            for lit in self.trail[self.limits[level]:]:
+                var = abs(lit)
+                self.phases[var] = self.values[var]
+                self.values[var] = None
+                self.truth[var] = self.truth[-var] = None
+                self.reasons[var] = None
+                heapq.heappush(self.heap, (-self.activity[var], var))
+            del self.trail[self.limits[level]:]
+            del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the most conflicts, or None."""
+        while self.heap:
+            activity, var = heapq.heappop(self.heap)
+            if self.values[var] is None and -activity == self.activity[var]:
+                return var
+        return None
+
+    def reduce(self):
+        """
+        Deletes the worse half of the learned clauses, by the number of
+        levels among their literals, keeping those spanning two or fewer.
+        Only called at level 0, where no learned clause is a reason the
+        search can still look at.
+        """
+        self.learned.sort(key=lambda entry: (entry[0], len(entry[1])))
+        half = len(self.learned) // 2
+        deleted = {id(clause) for levels, clause in self.learned[half:]
+                   if levels > 2}
+        self.learned = [entry for entry in self.learned
+                        if id(entry[1]) not in deleted]
+        self.watches = [[clause for clause in watching if id(clause) not in deleted]
+                        for watching in self.watches]
+
+    def walk(self, flips):
+        """
+        Looks for a model by probSAT local search from the saved phases,
+        keeping the variables assigned at level 0: flips a variable of a
+        random false clause, less likely the more true clauses it would
+        make false. Returns the model as a list of values indexed by
+        variable, or None after flips, with the phases set to the
+        assignment that left the fewest clauses false.
+        """
+        values = [value if value is not None else phase
+                  for value, phase in zip(self.values, self.phases)]
+        clauses = [clause for clause in self.clauses
+                   if not any(self.truth[lit] for lit in clause)]
+        occurs = [[] for _ in range(2 * self.count + 1)]
+        for i, clause in enumerate(clauses):
+            for lit in clause:
+                occurs[lit].append(i)
+
+        # True literals in each clause, and the false clauses with where
+        # each one sits in that list
+        trues = [sum(values[abs(lit)] == (lit > 0) for lit in clause)
+                 for clause in clauses]
+        false = [i for i, n in enumerate(trues) if n == 0]
+        where = [None] * len(clauses)
+        for k, i in enumerate(false):
+            where[i] = k
+
+        best = len(false)
+        self.phases = values[:]
+        for _ in range(flips):
+            if not false:
+                return values
+
+            # Pick a literal to make true, by the clauses it would break
+            clause = clauses[false[int(self.random.random() * len(false))]]
+            lits = [lit for lit in clause if self.values[abs(lit)] is None]
+            weights = [(1 + sum(trues[i] == 1 for i in occurs[-lit])) ** -self.BREAK
+                       for lit in lits]
+            pick = self.random.random() * sum(weights)
+            for lit, weight in zip(lits, weights):
+                pick -= weight
+                if pick <= 0:
+                    break
+
+            values[abs(lit)] = lit > 0
+            for i in occurs[lit]:
+                trues[i] += 1
+                if trues[i] == 1:
+                    k = where[i]
+                    false[k] = false[-1]
+                    where[false[k]] = k
+                    false.pop()
+            for i in occurs[-lit]:
+                trues[i] -= 1
+                if trues[i] == 0:
+                    where[i] = len(false)
+                    false.append(i)
+
+            if len(false) < best:
+                best = len(false)
+                self.phases = values[:]
+        return values if not false else None
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list of values indexed by
+        variable, or None if the clauses are unsatisfiable.
+        """
+        if self.conflict:
+            return None
+        self.pure_literals()
+        for clause in self.clauses:
+            if len(clause) == 1:
+                if self.value(clause[0]) is False:
+                    return None
+                if self.value(clause[0]) is None:
+                    self.assign(clause[0], clause)
+            else:
+                self.watch(clause)
+
+        restarts = 1
+        conflicts = 0
+        total = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.limits:
+                    return None
+                conflicts += 1
+                total += 1
+                learned, back = self.analyze(conflict)
+                levels = len({self.levels[abs(lit)] for lit in learned})
+                self.backtrack(back)
+                if len(learned) > 1:
+                    self.watch(learned)
+                    self.learned.append((levels, learned))
+                self.assign(learned[0], learned)
+            elif conflicts >= self.RESTART * luby(restarts):
+                restarts += 1
+                conflicts = 0
+                self.backtrack(0)
+                if len(self.learned) > self.max_learned:
+                    self.reduce()
+                    self.max_learned *= self.GROWTH
+                if restarts & (restarts - 1) == 0:
+                    model = self.walk(self.WALK * total)
+                    if model is not None:
+                        return model
+            else:
+                var = self.decide()
+                if var is None:
+                    return self.values
+                self.limits.append(len(self.trail))
+                self.assign(var if self.phases[var] else -var, None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of sentence as a dict of symbol names to values, or
+    None if sentence is unsatisfiable.
+    """
+    cnf = CNF(sentence)
+    values = Solver(cnf.clauses, cnf.count).solve()
+    if values is None:
+        return None
+    return {name: bool(values[v]) for name, v in cnf.variables.items()}
+
+
+# Models evaluated at once by vectorized model checking, as a power of 2
+CHUNK_BITS = 16
+
+
+def vector_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both over every
+    model with NumPy, 2 ** CHUNK_BITS models at a time.
+    """
+    import numpy as np
+
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    low, high = symbols[:CHUNK_BITS], symbols[CHUNK_BITS:]
+
+    # The low symbols take every combination of values within a chunk,
+    # the same in every chunk, while the high ones are fixed for a chunk
+    rows = np.arange(1 << len(low))
+    columns = {symbol: (rows >> k & 1).astype(bool)
+               for k, symbol in enumerate(low)}
+    for chunk in range(1 << len(high)):
+        for k, symbol in enumerate(high):
+            columns[symbol] = bool(chunk >> k & 1)
+        counterexample = np.logical_and(knowledge.vector(columns),
+                                        np.logical_not(query.vector(columns)))
+        if np.any(counterexample):
+            return False
+    return True
+
+
+def model_check(knowledge, query, method="sat"):
+    """
+    Checks if knowledge base entails query. With method "sat", that is if
+    knowledge ∧ ¬query is unsatisfiable; with "enumerate", if query is true
+    in every model of the symbols in which knowledge is true, skipping the
+    models in which a partial model already settles it. "compiled"
+    enumerates the same models, evaluating compiled sentences, and
+    "vector" evaluates them all at once with NumPy.
+    """
+    if method == "sat":
+        return satisfiable(And(knowledge, Not(query))) is None
+    if method == "vector":
+        return vector_check(knowledge, query)
+    if method == "compiled":
+        symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+        knowledge_true = knowledge.compile(symbols)
+        query_true = query.compile(symbols)
+        return all(query_true(model) for model in
+                   itertools.product((True, False), repeat=len(symbols))
+                   if knowledge_true(model))
+    if method != "enumerate":
+        raise ValueError(f"unknown method {method}")
+
+    # Get all symbols in both knowledge and query, in a fixed order
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+
+    # Assign the symbols in order in one model, depth first, trying True
+    # before False; values holds the value of each assigned symbol
+    model = {}
+    values = []
+    while True:
+
+        # A partial model settles every model extending it once the
+        # knowledge is false or the query is true in it
+        known = knowledge.partial(model)
+        holds = query.partial(model)
+        if known is True and holds is False:
+            return False
+        if known is False or holds is True:
+
+            # Back up to the last symbol still true, and make it false
+            while values and not values[-1]:
+                values.pop()
+                del model[symbols[len(values)]]
+            if not values:
+                return True
+            values[-1] = False
+            model[symbols[len(values) - 1]] = False
+        else:
+            model[symbols[len(values)]] = True
+            values.append(True)
+
+
+class KnowledgeBase():
+    """
+    Answers queries against the models of a knowledge base, found once and
+    cached. Models are built up a conjunct at a time: each one extends the
+    models with its new symbols and keeps those in which it is true. When
+    And.add appends conjuncts to the knowledge, only the new ones are
+    applied on the next query.
+    """
+
+    def __init__(self, knowledge):
+        self.knowledge = knowledge
+        self.symbols = []
+        self.models = [()]
+        self.count = 0
+
+    def conjuncts(self):
+        """Returns the conjuncts of the knowledge base."""
+        if isinstance(self.knowledge, And):
+            return self.knowledge.conjuncts
+        return [self.knowledge]
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge base."""
+        if not isinstance(self.knowledge, And):
+            self.knowledge = And(self.knowledge)
+        self.knowledge.add(sentence)
+
+    def update(self):
+        """Applies the conjuncts added since the models were last updated."""
+        conjuncts = self.conjuncts()
+
+        # Conjuncts can only be appended; anything else starts over
+        if len(conjuncts) < self.count:
+            self.symbols, self.models, self.count = [], [()], 0
+
+        for conjunct in conjuncts[self.count:]:
+            new = sorted(conjunct.symbols() - set(self.symbols))
+            self.symbols.extend(new)
+            true = conjunct.compile(self.symbols)
+            self.models = [
+                model + values
+                for model in self.models
+                for values in itertools.product((True, False), repeat=len(new))
+                if true(model + values)
+            ]
+        self.count = len(conjuncts)
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+        self.update()
+        extra = sorted(query.symbols() - set(self.symbols))
+        true = query.compile(self.symbols + extra)
+        return all(
+            true(model + values)
+            for model in self.models
+            for values in itertools.product((True, False), repeat=len(extra))
+        )
@@ -0,0 +1,91 @@
+import itertools
+import random
+import time
+
+from logic import *
+
+# Seconds each random 3-SAT knowledge base may take to answer
+TIME_LIMIT = 20
+
+
+def random_knowledge(count, ratio, seed):
+    """
+    Returns a random 3-SAT knowledge base over count symbols, with ratio
+    clauses per symbol, and its symbols.
+    """
+    rng = random.Random(seed)
+    symbols = [Symbol(f"p{i}") for i in range(count)]
+
+    def literal():
+        symbol = rng.choice(symbols)
+        return symbol if rng.random() < 0.5 else Not(symbol)
+
+    knowledge = And(*[Or(literal(), literal(), literal())
+                      for _ in range(int(count * ratio))])
+    return knowledge, symbols
+
+
+def test_sat_solves_hundreds_of_symbols():
+    for seed in range(6):
+        knowledge, symbols = random_knowledge(250, 4, seed)
+        start = time.perf_counter()
+        model = satisfiable(And(knowledge, Not(symbols[0])))
+        assert time.perf_counter() - start < TIME_LIMIT
+
+        # These knowledge bases all have models with p0 false
+        assert model is not None
+        for symbol in symbols:
+            model.setdefault(symbol.name, False)
+        assert knowledge.evaluate(model) and not model["p0"]
+
+
+def test_sat_agrees_with_enumeration():
+    for seed in range(200):
+        knowledge, symbols = random_knowledge(8, 4.5, seed)
+        for symbol in symbols:
+            assert (model_check(knowledge, symbol)
+                    == model_check(knowledge, symbol, method="enumerate"))
+
+
+def deep_sentence(depth):
+    """
+    Returns a chain of depth implications, nested far deeper than Python's
+    parser accepts in one expression.
+    """
+    sentence = Symbol("a")
+    for i in range(depth):
+        sentence = Implication(Symbol(f"b{i % 5}"), sentence)
+    return sentence
+
+
+def test_compile_deep_sentence():
+    sentence = deep_sentence(250)
+    symbols = sorted(sentence.symbols())
+    function = sentence.compile(symbols)
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        assert function(values) == sentence.evaluate(dict(zip(symbols, values)))
+    assert not model_check(sentence, Symbol("a"), method="compiled")
+    assert model_check(And(sentence, Symbol("b0"), Symbol("b1"), Symbol("b2"),
+                           Symbol("b3"), Symbol("b4")),
+                       Symbol("a"), method="compiled")
+
+
+def test_knowledge_base_deep_sentences():
+    knowledge = And(Symbol("b0"))
+    kb = KnowledgeBase(knowledge)
+    assert not kb.entails(Symbol("a"))
+
+    # A deep conjunct added to the knowledge, then a deep query
+    knowledge.add(deep_sentence(250))
+    kb.add(And(Symbol("b1"), Symbol("b2"), Symbol("b3"), Symbol("b4")))
+    assert kb.entails(Symbol("a"))
+    assert kb.entails(deep_sentence(300))
+    assert not kb.entails(Not(deep_sentence(300)))
+
+
+if __name__ == "__main__":
+    test_sat_solves_hundreds_of_symbols()
+    test_sat_agrees_with_enumeration()
+    test_compile_deep_sentence()
+    test_knowledge_base_deep_sentences()
+    print("ok")
@@ -21,10 +21,13 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
+
+    # Find the models of the knowledge once, for every query
+    kb = KnowledgeBase(knowledge)
     for symbol in symbols:
-        if model_check(knowledge, symbol):
+        if kb.entails(symbol):
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif not kb.entails(Not(symbol)):
             print(f"{symbol}: MAYBE")
 
 